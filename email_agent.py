@@ -1,32 +1,131 @@
 import os
-import json
+import re
+import atexit
 import sqlite3
 import base64
-from datetime import datetime, timedelta
-
-import requests
-from flask import Flask, render_template, request, jsonify
+import functools
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import fastjsonschema
+import orjson
+from flask import Flask, Response, abort, render_template, request, jsonify, stream_template, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from dotenv import load_dotenv
-from google import genai
+from jinja2 import FileSystemBytecodeCache
 
 load_dotenv()
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Serialize Flask JSON responses with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Persist compiled templates so a fresh worker skips recompiling them.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+# Compress HTML/JSON responses; low levels keep the CPU cost small.
+app.config.update(
+    COMPRESS_MIMETYPES=["text/html", "application/json"],
+    COMPRESS_LEVEL=4,
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_MIN_SIZE=500,
+)
+Compress(app)
 
 DB_NAME = "email_history.db"
+HISTORY_PAGE_SIZE = 50
 
-# Gemini client (for generation)
+# Environment is read once at import; restart the worker to pick up changes.
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+MAIL_FROM = os.getenv("MAIL_FROM")
+
+# google.genai and requests are slow to import, so the Gemini client and
+# the SendGrid session are created on first use; /health and /ping never
+# pay for them.
+# Each has its own lock, taken only while it is still None (double-checked).
+gemini_client = None
+sg_session = None
+GEMINI_CLIENT_LOCK = threading.Lock()
+SG_SESSION_LOCK = threading.Lock()
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+
+def get_gemini_client():
+    global gemini_client
+    if gemini_client is None:
+        with GEMINI_CLIENT_LOCK:
+            if gemini_client is None:
+                from google import genai
+                gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+    return gemini_client
+
+
+def get_sg_session():
+    # Keeps TCP/TLS connections alive between sends.
+    global sg_session
+    if sg_session is None:
+        with SG_SESSION_LOCK:
+            if sg_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=16,
+                    # POST is not in Retry's default allowed_methods, so only failed
+                    # connects are retried and an accepted email is never sent twice.
+                    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+                ))
+                session.headers.update({
+                    "Authorization": f"Bearer {SENDGRID_API_KEY}",
+                    "Content-Type": "application/json",
+                })
+                sg_session = session
+    return sg_session
 
 
 # ==============================
 # DATABASE
 # ==============================
+# One connection per worker process, shared across requests.
+# Autocommit mode; writes are serialized through DB_LOCK within a worker.
+# The connection keeps a generous busy timeout so schema setup at import
+# (e.g. another worker building the index) waits instead of failing boot.
+# write_rows() lowers it per attempt and does its own bounded backoff.
+DB_BUSY_TIMEOUT = 20.0
+db_conn = sqlite3.connect(
+    DB_NAME, timeout=DB_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None
+)
+db_conn.executescript("""
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA mmap_size=268435456;
+    PRAGMA cache_size=-20000;
+    PRAGMA temp_store=MEMORY;
+""")
+DB_LOCK = threading.Lock()
+
+
 def init_db():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("""
+    db_conn.execute("""
         CREATE TABLE IF NOT EXISTS emails (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             receiver_email TEXT,
@@ -35,8 +134,11 @@ def init_db():
             sent_time TEXT
         )
     """)
-    conn.commit()
-    conn.close()
+    # Covers the /history listing so it never touches the (large) body column.
+    db_conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_emails_id_desc
+        ON emails (id DESC, receiver_email, subject, sent_time)
+    """)
 
 
 init_db()
@@ -48,30 +150,182 @@ init_db()
 def parse_json_response(text: str):
     cleaned = (text or "").strip()
     if cleaned.startswith("```"):
-        cleaned = cleaned.replace("```json", "").replace("```", "").strip()
-    return json.loads(cleaned)
+        # Slice out the fenced block: skip the opening fence and its optional
+        # "json" tag, and cut at the closing fence (if any).
+        start = 7 if cleaned.startswith("json", 3) else 3
+        end = cleaned.rfind("```")
+        cleaned = cleaned[start:end] if end >= start else cleaned[start:]
+    return orjson.loads(cleaned.encode())
+
+
+# Statement text lives in module constants so every call hands sqlite3 the
+# same SQL and hits the connection's prepared-statement cache.
+INSERT_EMAIL_SQL = """
+    INSERT INTO emails (receiver_email, subject, body, sent_time)
+    VALUES (?, ?, ?, ?)
+"""
+HISTORY_PAGE_SQL = """
+    SELECT id, receiver_email, subject, sent_time FROM emails
+    WHERE id < ? ORDER BY id DESC LIMIT ?
+"""
+EMAIL_DETAIL_SQL = """
+    SELECT id, receiver_email, subject, body, sent_time FROM emails
+    WHERE id = ?
+"""
+# Largest SQLite integer; used as the ?before= cursor for the first page.
+MAX_EMAIL_ID = 2**63 - 1
+
+
+def stripped_fields(form, *names):
+    return [(form.get(name) or "").strip() for name in names]
+
+
+# Deliberately loose (one "@", dotted domain, no whitespace) so any real
+# address, including apostrophes and non-ASCII/IDN, is left to SendGrid.
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s.]+(?:\.[^@\s.]+)+")
+
+
+def is_valid_email(email: str) -> bool:
+    return EMAIL_RE.fullmatch(email) is not None
+
+
+# Multiple of 3 bytes so each chunk base64-encodes without padding.
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+
+def encode_attachment(attachment) -> str:
+    # The raw file is read and encoded one block at a time, so it is never
+    # held whole. The base64 text still is: the encoded blocks plus the
+    # final joined str (the JSON payload for SendGrid needs the full value).
+    attachment.stream.seek(0)
+    blocks = []
+    while chunk := attachment.stream.read(ATTACHMENT_CHUNK_SIZE):
+        blocks.append(base64.b64encode(chunk).decode("ascii"))
+    return "".join(blocks)
+
+
+# History rows are buffered in memory and written in batches by a
+# background thread, one transaction per batch.
+PENDING_ROWS = deque()
+FLUSH_INTERVAL = 0.5
+FLUSH_BATCH_SIZE = 100
+HISTORY_FLUSH_TIMEOUT = 0.5
+flush_wakeup = threading.Event()
+# With WRITE_BUSY_TIMEOUT_MS per attempt, a write gives up after ~4 s at
+# most, well under gunicorn's 30 s worker timeout.
+WRITE_RETRIES = 6
+WRITE_RETRY_DELAY = 0.05
+WRITE_BUSY_TIMEOUT_MS = 100
+
+
+# (epoch second, formatted string); rows within the same second reuse it.
+timestamp_cache = (0, "")
+
+
+def now_timestamp() -> str:
+    global timestamp_cache
+    sec = int(time.time())
+    cached_sec, formatted = timestamp_cache
+    if cached_sec != sec:
+        formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+        timestamp_cache = (sec, formatted)
+    return formatted
 
 
 def save_to_db(to_email: str, subject: str, body: str):
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO emails (receiver_email, subject, body, sent_time)
-        VALUES (?, ?, ?, ?)
-    """, (to_email, subject, body, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-    conn.commit()
-    conn.close()
+    PENDING_ROWS.append((to_email, subject, body, now_timestamp()))
+    if len(PENDING_ROWS) >= FLUSH_BATCH_SIZE:
+        flush_wakeup.set()
 
 
-def send_email_via_sendgrid(to_email: str, subject: str, body: str, attachment=None):
-    SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
-    MAIL_FROM = os.getenv("MAIL_FROM")
+def flush_pending_rows(lock_timeout: float = -1):
+    # Returns without writing if DB_LOCK isn't free within lock_timeout.
+    if not DB_LOCK.acquire(timeout=lock_timeout):
+        return
+    try:
+        rows = []
+        while PENDING_ROWS:
+            rows.append(PENDING_ROWS.popleft())
+        if not rows:
+            return
+
+        try:
+            write_rows(rows)
+        except Exception:
+            # Keep the rows for the next flush.
+            PENDING_ROWS.extendleft(reversed(rows))
+            raise
+    finally:
+        DB_LOCK.release()
+
+
+def write_rows(rows):
+    # BEGIN IMMEDIATE takes the write lock up front, so a busy database
+    # fails here (and is retried) rather than midway through the batch.
+    # Called with DB_LOCK held, so the shortened busy timeout only ever
+    # applies to these writes.
+    db_conn.execute(f"PRAGMA busy_timeout={WRITE_BUSY_TIMEOUT_MS}")
+    try:
+        delay = WRITE_RETRY_DELAY
+        for attempt in range(WRITE_RETRIES):
+            try:
+                db_conn.execute("BEGIN IMMEDIATE")
+                db_conn.executemany(INSERT_EMAIL_SQL, rows)
+                db_conn.execute("COMMIT")
+                return
+            except sqlite3.OperationalError as e:
+                if db_conn.in_transaction:
+                    db_conn.execute("ROLLBACK")
+                if "locked" not in str(e) or attempt == WRITE_RETRIES - 1:
+                    raise
+            except Exception:
+                if db_conn.in_transaction:
+                    db_conn.execute("ROLLBACK")
+                raise
+
+            time.sleep(delay + random.random() * delay)
+            delay *= 2
+    finally:
+        db_conn.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT * 1000)}")
+
+
+def flush_loop():
+    while True:
+        flush_wakeup.wait(FLUSH_INTERVAL)
+        flush_wakeup.clear()
+        try:
+            flush_pending_rows()
+        except Exception:
+            app.logger.exception("Failed to write email history")
+
+
+threading.Thread(target=flush_loop, name="db-flush", daemon=True).start()
+atexit.register(flush_pending_rows)
+
+
+def build_attachment(attachment):
+    # Read the upload on the request thread: Werkzeug closes the stream
+    # once the request ends, before a queued send would get to it.
+    if not (attachment and getattr(attachment, "filename", "")):
+        return None
+    return {
+        "content": encode_attachment(attachment),
+        "type": "application/octet-stream",
+        "filename": attachment.filename,
+        "disposition": "attachment"
+    }
+
 
+def check_sendgrid_config():
     if not SENDGRID_API_KEY:
         raise RuntimeError("SENDGRID_API_KEY is missing in Render Environment Variables.")
     if not MAIL_FROM:
         raise RuntimeError("MAIL_FROM is missing (must be a verified sender in SendGrid).")
 
+
+def send_email_via_sendgrid(to_email: str, subject: str, body: str, attachment=None):
+    check_sendgrid_config()
+
     payload = {
         "personalizations": [
             {"to": [{"email": to_email}]}
@@ -84,22 +338,12 @@ def send_email_via_sendgrid(to_email: str, subject: str, body: str, attachment=N
         ]
     }
 
-    if attachment and getattr(attachment, "filename", ""):
-        attachment.seek(0)
-        file_bytes = attachment.read()
-        payload["attachments"] = [{
-            "content": base64.b64encode(file_bytes).decode("utf-8"),
-            "type": "application/octet-stream",
-            "filename": attachment.filename,
-            "disposition": "attachment"
-        }]
-
-    response = requests.post(
-        "https://api.sendgrid.com/v3/mail/send",
-        headers={
-            "Authorization": f"Bearer {SENDGRID_API_KEY}"
-        },
-        json=payload,
+    if attachment:
+        payload["attachments"] = [attachment]
+
+    response = get_sg_session().post(
+        SENDGRID_URL,
+        data=orjson.dumps(payload),
         timeout=30
     )
 
@@ -111,77 +355,49 @@ def send_email_via_sendgrid(to_email: str, subject: str, body: str, attachment=N
         raise RuntimeError(f"SendGrid failed ({response.status_code}): {detail}")
 
     save_to_db(to_email, subject, body)
-    # Attachment (optional)
-    if attachment and getattr(attachment, "filename", ""):
-        attachment.seek(0)
-        file_bytes = attachment.read()
-        payload["attachments"] = [{
-            "content": base64.b64encode(file_bytes).decode("utf-8"),
-            "type": "application/octet-stream",
-            "filename": attachment.filename,
-            "disposition": "attachment"
-        }]
-
-    res = requests.post(
-        "https://api.sendgrid.com/v3/mail/send",
-        headers={"Authorization": f"Bearer {SENDGRID_API_KEY}"},
-        json=payload,
-        timeout=30
-    )
-
-    if res.status_code != 202:
-        try:
-            detail = res.json()
-        except Exception:
-            detail = res.text
-        raise RuntimeError(f"SendGrid failed ({res.status_code}): {detail}")
-
-    save_to_db(to_email, subject, body)
 
 
 # ==============================
-# ROUTES
+# SEND QUEUE
 # ==============================
-@app.get("/health")
-def health():
-    # Quick sanity checks (no secrets leaked)
-    return jsonify({
-        "ok": True,
-        "has_gemini_key": bool(os.getenv("GEMINI_API_KEY")),
-        "has_sendgrid_key": bool(os.getenv("SENDGRID_API_KEY")),
-        "has_mail_from": bool(os.getenv("MAIL_FROM")),
-    }), 200
-
-
-@app.get("/")
-def home():
-    return render_template("index.html")
-
-
-@app.post("/generate-email")
-def generate_email():
-    try:
-        if not client:
-            return jsonify({"error": "GEMINI_API_KEY not set on server."}), 500
+# Sends run on a thread pool so requests don't wait on SendGrid. Task state
+# lives in this worker process only; oldest tasks are dropped past the cap.
+# /status/<task_id> therefore 404s on other workers, after a restart or
+# eviction; clients must treat that as "unknown", not as a failed send.
+SEND_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="send")
+SEND_TASKS = {}
+SEND_TASKS_LOCK = threading.Lock()
+MAX_SEND_TASKS = 1000
+
+
+def log_send_failure(task_id: str, future):
+    # /status may not be able to report this (other worker, evicted task),
+    # so failures always go to the log as well.
+    error = future.exception()
+    if error is not None:
+        app.logger.error(
+            "Send task %s failed: %s", task_id, error,
+            exc_info=(type(error), error, error.__traceback__),
+        )
 
-        receiver_name = request.form.get("receiver_name", "").strip()
-        sender_name = request.form.get("sender_name", "").strip()
-        mail_body = request.form.get("mail_body", "").strip()
-        tone = request.form.get("tone", "").strip()
-        email_type = request.form.get("email_type", "").strip()
 
-        if not receiver_name or not sender_name or not mail_body or not tone:
-            return jsonify({"error": "Missing required fields for generation."}), 400
+def queue_send(to_email: str, subject: str, body: str, attachment=None) -> str:
+    task_id = uuid.uuid4().hex
+    future = SEND_POOL.submit(send_email_via_sendgrid, to_email, subject, body, attachment)
+    future.add_done_callback(functools.partial(log_send_failure, task_id))
+    with SEND_TASKS_LOCK:
+        SEND_TASKS[task_id] = future
+        while len(SEND_TASKS) > MAX_SEND_TASKS:
+            del SEND_TASKS[next(iter(SEND_TASKS))]
+    return task_id
 
-        tomorrow = datetime.now() + timedelta(days=1)
-        formatted_date = tomorrow.strftime("%d %B %Y")
 
-        prompt = f"""
+PROMPT_TEMPLATE = """
 Write a professional email.
 
 Email Type: {email_type}
 Tone: {tone}
-Replace any word like tomorrow with {formatted_date}.
+Replace any word like tomorrow with {date}.
 No placeholders.
 Return strictly valid JSON only.
 
@@ -190,21 +406,111 @@ Return strictly valid JSON only.
   "body": "email body"
 }}
 
-Sender: {sender_name}
-Receiver: {receiver_name}
-Purpose: {mail_body}
+Sender: {sender}
+Receiver: {receiver}
+Purpose: {purpose}
 """
 
-        response = client.models.generate_content(
+
+# Compiled once; extra keys from the model are tolerated and dropped.
+# 998 is the RFC 5322 line limit, which a subject header must fit in.
+validate_email_content = fastjsonschema.compile({
+    "type": "object",
+    "required": ["subject", "body"],
+    "properties": {
+        "subject": {"type": "string", "maxLength": 998},
+        "body": {"type": "string"},
+    },
+})
+
+
+@functools.lru_cache(maxsize=1)
+def tomorrow_date(today: date) -> str:
+    return (today + timedelta(days=1)).strftime("%d %B %Y")
+
+
+# ==============================
+# ROUTES
+# ==============================
+# Bodies that never change are serialized once. A new Response is still
+# built per request because after-request hooks may modify it.
+# Quick sanity checks (no secrets leaked); config is fixed for the process.
+HEALTH_BODY = orjson.dumps({
+    "ok": True,
+    "has_gemini_key": bool(GEMINI_API_KEY),
+    "has_sendgrid_key": bool(SENDGRID_API_KEY),
+    "has_mail_from": bool(MAIL_FROM),
+})
+PING_BODY = b"ok"
+PENDING_BODY = orjson.dumps({"status": "pending"})
+
+ERRORS = {
+    "no_gemini_key": (orjson.dumps({"error": "GEMINI_API_KEY not set on server."}), 500),
+    "generate_fields": (orjson.dumps({"error": "Missing required fields for generation."}), 400),
+    "bad_model_json": (orjson.dumps({"error": "Model returned invalid JSON shape."}), 500),
+    "send_fields": (orjson.dumps({"error": "Missing required fields (receiver_email/subject/body)."}), 400),
+    "bad_email": (orjson.dumps({"error": "Invalid receiver email address."}), 400),
+    "unknown_task": (orjson.dumps({"error": "Unknown task."}), 404),
+}
+
+
+def json_bytes_response(body: bytes, status: int = 200) -> Response:
+    return Response(body, status=status, mimetype="application/json")
+
+
+def error_response(code: str) -> Response:
+    body, status = ERRORS[code]
+    return json_bytes_response(body, status)
+
+
+@app.get("/health")
+def health():
+    return json_bytes_response(HEALTH_BODY)
+
+
+@app.get("/")
+def home():
+    return render_template("index.html")
+
+
+@app.post("/generate-email")
+def generate_email():
+    try:
+        if not GEMINI_API_KEY:
+            return error_response("no_gemini_key")
+
+        form = request.form
+        receiver_name, sender_name, mail_body = stripped_fields(
+            form, "receiver_name", "sender_name", "mail_body"
+        )
+        # tone/email_type come from <select> options and need no stripping.
+        tone = form.get("tone", "")
+        email_type = form.get("email_type", "")
+
+        if not (receiver_name and sender_name and mail_body and tone):
+            return error_response("generate_fields")
+
+        prompt = PROMPT_TEMPLATE.format_map({
+            "email_type": email_type,
+            "tone": tone,
+            "date": tomorrow_date(date.today()),
+            "sender": sender_name,
+            "receiver": receiver_name,
+            "purpose": mail_body,
+        })
+
+        response = get_gemini_client().models.generate_content(
             model="gemini-2.5-flash-lite",
             contents=prompt,
         )
 
         email_content = parse_json_response(response.text)
-        if "subject" not in email_content or "body" not in email_content:
-            return jsonify({"error": "Model returned invalid JSON shape."}), 500
+        try:
+            validate_email_content(email_content)
+        except fastjsonschema.JsonSchemaException:
+            return error_response("bad_model_json")
 
-        return jsonify(email_content), 200
+        return jsonify({"subject": email_content["subject"], "body": email_content["body"]}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -213,34 +519,84 @@ Purpose: {mail_body}
 @app.post("/confirm-send")
 def confirm_send():
     try:
-        receiver_email = request.form.get("receiver_email", "").strip()
-        subject = request.form.get("subject", "").strip()
-        body = request.form.get("body", "").strip()
+        receiver_email, subject, body = stripped_fields(
+            request.form, "receiver_email", "subject", "body"
+        )
         attachment = request.files.get("attachment")
 
-        if not receiver_email or not subject or not body:
-            return jsonify({"error": "Missing required fields (receiver_email/subject/body)."}), 400
+        if not (receiver_email and subject and body):
+            return error_response("send_fields")
+        if not is_valid_email(receiver_email):
+            return error_response("bad_email")
 
-        send_email_via_sendgrid(receiver_email, subject, body, attachment)
-        return jsonify({"message": "Email sent successfully!"}), 200
+        check_sendgrid_config()
+        task_id = queue_send(receiver_email, subject, body, build_attachment(attachment))
+        return jsonify({"message": "Email queued for sending.", "task_id": task_id}), 202
 
     except Exception as e:
         # Always JSON error
         return jsonify({"error": f"Send failed: {str(e)}"}), 500
 
 
+@app.get("/status/<task_id>")
+def send_status(task_id: str):
+    with SEND_TASKS_LOCK:
+        future = SEND_TASKS.get(task_id)
+    if future is None:
+        return error_response("unknown_task")
+    if not future.done():
+        return json_bytes_response(PENDING_BODY)
+
+    error = future.exception()
+    if error is not None:
+        return jsonify({"status": "failed", "error": f"Send failed: {error}"}), 200
+    return jsonify({"status": "sent", "message": "Email sent successfully!"}), 200
+
+
+# The /history page frame is static: render it once, stream rows between.
+HISTORY_HEADER = app.jinja_env.get_template("_history_header.html").render().encode()
+HISTORY_FOOTER = app.jinja_env.get_template("_history_footer.html").render().encode()
+
+
 @app.get("/history")
 def history():
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM emails ORDER BY id DESC")
-    emails = cur.fetchall()
-    conn.close()
-    return render_template("history.html", emails=emails)
+    # Best effort: write this worker's buffered rows so a just-sent email is
+    # listed. If the database is busy, render what is already committed and
+    # leave the rows to the background flusher.
+    try:
+        flush_pending_rows(lock_timeout=HISTORY_FLUSH_TIMEOUT)
+    except Exception:
+        app.logger.exception("Failed to write email history")
+
+    # Keyset pagination: ?before=<id> returns the next page of older emails.
+    before = request.args.get("before", MAX_EMAIL_ID, type=int)
+    if not 0 <= before <= MAX_EMAIL_ID:
+        # Outside SQLite's integer range; fall back to the first page.
+        before = MAX_EMAIL_ID
+    emails = db_conn.execute(HISTORY_PAGE_SQL, (before, HISTORY_PAGE_SIZE)).fetchall()
+    next_before = emails[-1][0] if len(emails) == HISTORY_PAGE_SIZE else None
+
+    def generate():
+        yield HISTORY_HEADER
+        yield from stream_template("_history_rows.html", emails=emails, next_before=next_before)
+        yield HISTORY_FOOTER
+
+    return Response(stream_with_context(generate()), mimetype="text/html")
+
+
+@app.get("/history/<int:email_id>")
+def history_detail(email_id: int):
+    if email_id > MAX_EMAIL_ID:
+        abort(404)
+    email = db_conn.execute(EMAIL_DETAIL_SQL, (email_id,)).fetchone()
+    if email is None:
+        abort(404)
+    return render_template("email.html", email=email)
+
 
 @app.get("/ping")
 def ping():
-    return "ok", 200
+    return Response(PING_BODY, status=200, mimetype="text/plain")
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file